@@ -3,8 +3,23 @@ import csv
 from datetime import datetime
 import os
 import threading
-import html
-import pytz # New library for timezone handling
+import queue
+import io
+import atexit
+import logging
+import functools
+from contextlib import contextmanager
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo # Standard-library timezone handling
+import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+try:
+    import fcntl
+except ImportError: # Windows has no fcntl; writes there fall back to an in-process lock.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
 # IMPORTANT: Set the year for the debates to the current year.
@@ -20,114 +35,298 @@ TIMEZONE = "America/Toronto"
 # IMPORTANT: SET YOUR REVEAL SCHEDULE HERE
 # These keys ("Sep 26", "Oct 3", etc.) MUST correspond to the dates in your CSV.
 # The code will now automatically read the date from the CSV and match it to these keys.
-tz = pytz.timezone(TIMEZONE)
+tz = ZoneInfo(TIMEZONE)
 REVEAL_SCHEDULE = {
-    "Sep 26": tz.localize(datetime(DEBATE_YEAR, 9, 24, 0, 0)),
-    "Oct 10":  tz.localize(datetime(DEBATE_YEAR, 10, 8, 0, 0)),
-    "Oct 24": tz.localize(datetime(DEBATE_YEAR, 10, 22, 0, 0)),
-    "Nov 07":  tz.localize(datetime(DEBATE_YEAR, 11, 5, 0, 0)),
-    "Nov 21": tz.localize(datetime(DEBATE_YEAR, 11, 19, 0, 0))
+    "Sep 26": datetime(DEBATE_YEAR, 9, 24, 0, 0, tzinfo=tz),
+    "Oct 10":  datetime(DEBATE_YEAR, 10, 8, 0, 0, tzinfo=tz),
+    "Oct 24": datetime(DEBATE_YEAR, 10, 22, 0, 0, tzinfo=tz),
+    "Nov 07":  datetime(DEBATE_YEAR, 11, 5, 0, 0, tzinfo=tz),
+    "Nov 21": datetime(DEBATE_YEAR, 11, 19, 0, 0, tzinfo=tz)
 }
+# Derived once at startup so the page can compare plain integers and reuse the "Reveals ..." text.
+REVEAL_SCHEDULE_TS = {key: int(reveal_date.timestamp()) for key, reveal_date in REVEAL_SCHEDULE.items()}
+REVEAL_LABELS = {key: f"Reveals {reveal_date.strftime('%b %d')}" for key, reveal_date in REVEAL_SCHEDULE.items()}
 
 SCHEDULE_FILE = 'schedule.csv'
 SUBMISSIONS_FILE = 'submissions.csv'
 SUBMISSION_HEADERS = ['Debate Number', 'Stakeholder', 'Team Name', 'Position', 'Submission Time']
+TEAM_COLS = ('Team 1', 'Team 2', 'Team 3', 'Team 4')
+STAKEHOLDER_COLS = ('Stakeholder 1', 'Stakeholder 2', 'Stakeholder 3', 'Stakeholder 4')
+POSITION_COLS = ('Position 1', 'Position 2', 'Position 3', 'Position 4')
+# submissions.csv is an append-only log; it is rewritten once it holds this many rows per live submission.
+COMPACTION_RATIO = 4
+
+MONTH_ABBR = ('', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
 
 # --- FILE LOCKING FOR SAFE SIMULTANEOUS WRITES ---
-file_lock = threading.Lock()
+# flock works across processes, not just threads. The lock lives in its own file because
+# compaction swaps submissions.csv out with os.replace, which would orphan a lock held on it.
+SUBMISSIONS_LOCK_FILE = SUBMISSIONS_FILE + '.lock'
+
+# Streamlit re-executes this file on every rerun, so the fallback lock is held in cache_resource to stay one per process.
+@st.cache_resource
+def _thread_lock():
+    return threading.Lock()
+
+@contextmanager
+def submissions_lock():
+    if not fcntl:
+        with _thread_lock():
+            yield
+        return
+    with open(SUBMISSIONS_LOCK_FILE, mode='a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 # --- DATA HANDLING & HELPER FUNCTIONS ---
 
-def get_reveal_date_for_debate(debate_row):
+def get_reveal_key_for_debate(debate_row):
     """
     Smarter function that reads the date from the CSV (e.g., "2025-09-26 10:10"),
-    converts it to a "Month Day" key (e.g., "Sep 26"), and finds the reveal date.
+    converts it to a "Month Day" key (e.g., "Sep 26"), and returns it if it has a reveal date.
     """
     date_str = debate_row.get('Date and Time', '')
     if not date_str: return None
-    
+    return _reveal_key_for_date_str(date_str)
+
+def _iso_date_key(date_str):
+    """
+    Turns a "2025-09-26 10:10" style date into its REVEAL_SCHEDULE key ("Sep 26").
+    Raises ValueError if the date is not in YYYY-MM-DD format.
+    """
+    # Slicing the known layout directly is much cheaper than strptime; anything unusual falls through to strptime.
+    if date_str[4:5] == '-' and date_str[7:8] == '-' and date_str[10:11] in ('', ' '):
+        try:
+            year, month, day = int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])
+            datetime(year, month, day)
+            return f"{MONTH_ABBR[month]} {day:02d}"
+        except ValueError:
+            pass
+    # A blank date splits to nothing; strptime('') then raises the documented ValueError.
+    dt_obj = datetime.strptime((date_str.split() or [''])[0], '%Y-%m-%d')
+    return f"{MONTH_ABBR[dt_obj.month]} {dt_obj.day:02d}"
+
+# Only a handful of distinct dates exist and REVEAL_SCHEDULE never changes, so parse each one once.
+@functools.lru_cache(maxsize=64)
+def _reveal_key_for_date_str(date_str):
     try:
         # Try to parse the YYYY-MM-DD HH:MM format first
-        dt_obj = datetime.strptime(date_str.split()[0], '%Y-%m-%d')
+        key = _iso_date_key(date_str)
     except ValueError:
         try:
             # Fallback for "Month Day Time" format
             dt_obj = datetime.strptime(" ".join(date_str.split()[:2]), '%b %d')
         except ValueError:
             return None # Return None if format is unrecognized
+        # Format the parsed date into the key we use in REVEAL_SCHEDULE
+        key = f"{MONTH_ABBR[dt_obj.month]} {dt_obj.day:02d}"
+    return key if key in REVEAL_SCHEDULE else None
 
-    # Format the parsed date into the key we use in REVEAL_SCHEDULE
-    key = dt_obj.strftime('%b %d')
-    return REVEAL_SCHEDULE.get(key)
 
+def _read_records(reader):
+    # csv.reader + zip is noticeably cheaper than DictReader's per-row bookkeeping.
+    fieldnames = tuple(next(reader, ()))
+    width = len(fieldnames)
+    rows = []
+    for row in reader:
+        if not row: continue
+        # Match DictReader: missing trailing fields become None and extras are kept under the None key.
+        record = dict(zip(fieldnames, row + [None] * (width - len(row))))
+        if len(row) > width: record[None] = row[width:]
+        rows.append(record)
+    return rows
 
-def load_data_from_csv(filepath, headers=None):
+def load_data_from_csv(filepath):
     try:
         with open(filepath, mode='r', newline='', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            return list(reader)
+            return _read_records(csv.reader(csvfile))
     except FileNotFoundError:
-        if headers:
-            with open(filepath, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
         return []
 
-def find_debates_for_team(team_name, schedule):
+def _file_mtime(filepath):
+    try:
+        return os.path.getmtime(filepath)
+    except FileNotFoundError:
+        return None
+
+@st.cache_data
+def _load_csv_cached(filepath, mtime):
+    # mtime is only part of the cache key: editing the CSV invalidates the cached rows.
+    return load_data_from_csv(filepath)
+
+def index_submissions(submissions):
+    return {(int(s['Debate Number']), s['Stakeholder']): s for s in submissions}
+
+def find_debates_for_team(team_name):
     if not team_name: return []
-    found_debates = []
-    for debate_row in schedule:
-        for i in range(1, 5):
-            if debate_row.get(f'Team {i}', '').strip().lower() == team_name.strip().lower():
-                stakeholder_role = debate_row.get(f'Stakeholder {i}')
-                found_debates.append({'debate_details': debate_row, 'stakeholder_role': stakeholder_role})
-    return found_debates
+    team_index = _team_index(_file_mtime(SCHEDULE_FILE))
+    return team_index.get(team_name.strip().lower(), [])
+
+@st.cache_data
+def _schedule_index(mtime):
+    # Blank export rows (",,,,") carry no debate, so drop them before anything parses the number.
+    schedule = [row for row in _load_csv_cached(SCHEDULE_FILE, mtime) if (row.get('Debate') or '').strip()]
+    # Everything the pages derive from a row is worked out here, once per schedule version.
+    for row in schedule:
+        row['_debate_num'] = int(row['Debate'])
+        row['_reveal_key'] = get_reveal_key_for_debate(row)
+        row['_reveal_ts'] = REVEAL_SCHEDULE_TS.get(row['_reveal_key'])
+        row['_teams'] = tuple(row.get(team_col, '') for team_col in TEAM_COLS)
+        row['_stakeholders'] = tuple(row.get(stakeholder_col, '') for stakeholder_col in STAKEHOLDER_COLS)
+        row['_team_set'] = set(row['_teams'])
+    teams = sorted({team for row in schedule for team in row['_team_set'] if team})
+    return schedule, teams
+
+@st.cache_data
+def _team_index(mtime):
+    # Case-folded team name -> the debates that team appears in, so a team lookup doesn't scan the schedule.
+    team_index = defaultdict(list)
+    for debate_row in _schedule_index(mtime)[0]:
+        for team, stakeholder in zip(debate_row['_teams'], debate_row['_stakeholders']):
+            team = team.strip().lower()
+            if team:
+                team_index[team].append({'debate_details': debate_row, 'stakeholder_role': stakeholder})
+    return dict(team_index)
+
+@st.cache_data
+def _sanity_check(mtime):
+    errors = []
+    for row in _schedule_index(mtime)[0]:
+        date_str = row.get('Date and Time', '')
+        if date_str:
+            try:
+                key = _iso_date_key(date_str)
+                if key not in REVEAL_SCHEDULE:
+                    errors.append(f"Mismatch Found! The date '{date_str}' from your CSV (key: '{key}') is not in the REVEAL_SCHEDULE dictionary.")
+            except ValueError:
+                errors.append(f"Could not parse date '{date_str}' from CSV. Please use YYYY-MM-DD format.")
+    return errors
 
 def load_schedule():
-    schedule_data = load_data_from_csv(SCHEDULE_FILE)
+    schedule_data, all_teams = _schedule_index(_file_mtime(SCHEDULE_FILE))
     if not schedule_data:
         st.error(f"Error: The schedule file '{SCHEDULE_FILE}' was not found.")
         st.stop()
-    return schedule_data
+    return schedule_data, all_teams
+
+@st.cache_resource
+def _submission_store():
+    """
+    The process-wide copy of all submissions, shared by every session and rerun. Saves update it
+    in memory and queue the row for a background thread to append to submissions.csv.
+    """
+    store = {'by_key': {}, 'unwritten': {}, 'log_rows': 0, 'signature': None, 'queue': queue.Queue(), 'lock': threading.Lock()}
+    threading.Thread(target=_write_submissions, args=(store,), daemon=True).start()
+    # The writer is a daemon thread, so let it flush whatever is still queued before the process exits.
+    atexit.register(store['queue'].join)
+    return store
+
+def _parse_log(data):
+    """Parses raw submissions.csv bytes, ignoring a trailing line that is still being written."""
+    complete = data[:data.rfind(b'\n') + 1].decode('utf-8-sig')
+    return _read_records(csv.reader(io.StringIO(complete, newline='')))
+
+def _sync_store(store):
+    """Re-reads submissions.csv when it has changed since the last read, e.g. because another process wrote to it."""
+    try:
+        stat = os.stat(SUBMISSIONS_FILE)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        signature = None
+    if signature == store['signature']: return
+    try:
+        with open(SUBMISSIONS_FILE, mode='rb') as f: data = f.read()
+    except FileNotFoundError:
+        data = b''
+    log = _parse_log(data)
+    # Later rows in the log supersede earlier ones; rows still in the queue are newer than anything on disk.
+    store['by_key'] = {**index_submissions(log), **store['unwritten']}
+    store['log_rows'], store['signature'] = len(log), signature
+
+def _write_submissions(store):
+    while True:
+        key, record = store['queue'].get()
+        try:
+            with submissions_lock():
+                write_header = not os.path.exists(SUBMISSIONS_FILE) or os.path.getsize(SUBMISSIONS_FILE) == 0
+                with open(SUBMISSIONS_FILE, mode='a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if write_header: writer.writerow(SUBMISSION_HEADERS)
+                    writer.writerow([record[header] for header in SUBMISSION_HEADERS])
+            with store['lock']:
+                # A newer save for the same key may already be queued behind this one.
+                if store['unwritten'].get(key) is record: del store['unwritten'][key]
+                store['log_rows'] += 1
+            if store['log_rows'] > COMPACTION_RATIO * max(len(store['by_key']), 1):
+                store['log_rows'] = compact_submissions()
+        except Exception:
+            logger.exception("Could not write the submission for %s to %s", key, SUBMISSIONS_FILE)
+        finally:
+            store['queue'].task_done()
 
 def load_submissions():
-    with file_lock:
-        return load_data_from_csv(SUBMISSIONS_FILE, headers=SUBMISSION_HEADERS)
+    """Returns a copy of all submissions keyed by (debate number, stakeholder)."""
+    store = _submission_store()
+    with store['lock']:
+        _sync_store(store)
+        return dict(store['by_key'])
 
-def save_submission(debate_num, stakeholder, team_name, position):
-    with file_lock:
-        submissions = load_data_from_csv(SUBMISSIONS_FILE, headers=SUBMISSION_HEADERS)
-        record_found = False
-        for sub in submissions:
-            if int(sub['Debate Number']) == int(debate_num) and sub['Stakeholder'] == stakeholder:
-                sub['Team Name'] = team_name
-                sub['Position'] = position
-                sub['Submission Time'] = datetime.now(pytz.timezone(TIMEZONE)).strftime('%Y-%m-%d %H:%M:%S %Z')
-                record_found = True
-                break
-        if not record_found:
-            submissions.append({
-                'Debate Number': debate_num, 'Stakeholder': stakeholder, 'Team Name': team_name,
-                'Position': position, 'Submission Time': datetime.now(pytz.timezone(TIMEZONE)).strftime('%Y-%m-%d %H:%M:%S %Z')
-            })
-        with open(SUBMISSIONS_FILE, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=SUBMISSION_HEADERS)
+def load_app_data():
+    """
+    Loads the schedule and submissions. When the schedule has changed since this session last
+    read it, both are loaded in parallel to warm the caches; otherwise they come straight from cache.
+    """
+    schedule_mtime = _file_mtime(SCHEDULE_FILE)
+    if st.session_state.get('_loaded_schedule_mtime') != schedule_mtime:
+        with ThreadPoolExecutor(max_workers=2, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())) as executor:
+            schedule_future = executor.submit(_schedule_index, schedule_mtime)
+            submissions_future = executor.submit(load_submissions)
+            # Separate statements on purpose: a bare tuple expression would be rendered by Streamlit magic.
+            for future in (schedule_future, submissions_future): future.result()
+        st.session_state['_loaded_schedule_mtime'] = schedule_mtime
+    return load_schedule(), load_submissions()
+
+def compact_submissions():
+    """Rewrites submissions.csv with one row per submission and returns the resulting row count."""
+    with submissions_lock():
+        try:
+            with open(SUBMISSIONS_FILE, mode='rb') as f: log = _parse_log(f.read())
+        except FileNotFoundError:
+            return 0
+        submissions = index_submissions(log)
+        if len(log) <= len(submissions):
+            return len(log)
+        # Write the compacted log beside the original and swap it in, so readers never see a half-written file.
+        tmp_path = SUBMISSIONS_FILE + '.tmp'
+        with open(tmp_path, mode='w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=SUBMISSION_HEADERS, extrasaction='ignore')
             writer.writeheader()
-            writer.writerows(submissions)
+            writer.writerows(submissions.values())
+        os.replace(tmp_path, SUBMISSIONS_FILE)
+    return len(submissions)
+
+def save_submission(debate_num, stakeholder, team_name, position):
+    ts = datetime.now(tz).strftime('%Y-%m-%d %H:%M:%S %Z')
+    key = (int(debate_num), stakeholder)
+    record = dict(zip(SUBMISSION_HEADERS, [str(debate_num), stakeholder, team_name, position, ts]))
+    store = _submission_store()
+    with store['lock']:
+        store['by_key'][key] = store['unwritten'][key] = record
+        store['queue'].put((key, record))
     return True
 
-def generate_html_table(data, headers):
-    html_string = "<style> table { width: 100%; border-collapse: collapse; } th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; } </style>"
-    html_string += "<table><thead><tr>"
-    for header in headers: html_string += f"<th>{html.escape(header)}</th>"
-    html_string += "</tr></thead><tbody>"
-    for row in data:
-        html_string += "<tr>"
-        for header in headers:
-            html_string += f"<td>{html.escape(str(row.get(header, '')))}</td>"
-        html_string += "</tr>"
-    html_string += "</tbody></table>"
-    return html_string
+def reset_submissions():
+    store = _submission_store()
+    # Let queued rows reach the file first so none of them recreate it after the delete.
+    # This waits outside store['lock'] because the writer takes that lock after each append.
+    store['queue'].join()
+    with store['lock']:
+        with submissions_lock():
+            if os.path.exists(SUBMISSIONS_FILE): os.remove(SUBMISSIONS_FILE)
+        store['by_key'], store['unwritten'], store['log_rows'], store['signature'] = {}, {}, 0, None
 
 # --- APP LAYOUT ---
 st.set_page_config(layout="wide")
@@ -137,38 +336,39 @@ st.sidebar.markdown("---")
 st.sidebar.title("Instructor Access")
 password = st.sidebar.text_input("Enter password for admin panel:", type="password")
 
-schedule_data = load_schedule()
-submissions_data = load_submissions()
-now = datetime.now(pytz.timezone(TIMEZONE))
+(schedule_data, all_teams), sub_index = load_app_data()
+now = datetime.now(tz)
+now_ts = int(now.timestamp())
 
 if page == "View Full Schedule":
     st.title("Full Debate Schedule")
-    all_teams = sorted(list(set(team for row in schedule_data for i in range(1, 5) if (team := row.get(f'Team {i}')))))
     selected_team = st.selectbox("Filter schedule by team:", ["Show All Teams"] + all_teams)
     st.write("Positions are revealed automatically after the sign-up deadline for each debate day.")
-    results_data = [dict(row) for row in schedule_data]
-    if selected_team != "Show All Teams":
-        results_data = [row for row in results_data if any(row.get(f'Team {i}', '') == selected_team for i in range(1, 5))]
-
-    for debate in results_data:
-        reveal_date = get_reveal_date_for_debate(debate)
-        for i in range(1, 5):
-            team_name, stakeholder_name = debate.get(f'Team {i}'), debate.get(f'Stakeholder {i}')
-            position_col = f'Position {i}'
-            debate[position_col] = "—"
+    if selected_team == "Show All Teams": debates = schedule_data
+    else: debates = (row for row in schedule_data if selected_team in row['_team_set'])
+
+    # Build only the displayed columns, in display order, in a single pass over the schedule.
+    results_data = []
+    for debate in debates:
+        reveal_key, reveal_ts, debate_num = debate['_reveal_key'], debate['_reveal_ts'], debate['_debate_num']
+        row = {'Debate': debate_num, 'Date and Time': debate.get('Date and Time'), 'Resolution': debate.get('Resolution')}
+        for team_name, stakeholder_name, team_col, stakeholder_col, position_col in zip(debate['_teams'], debate['_stakeholders'], TEAM_COLS, STAKEHOLDER_COLS, POSITION_COLS):
+            position = "—"
             if team_name:
-                if reveal_date is None:
-                    debate[position_col] = "CONFIG ERROR" 
-                elif now < reveal_date:
-                    debate[position_col] = f"Reveals {reveal_date.strftime('%b %d')}"
+                if reveal_key is None:
+                    position = "CONFIG ERROR" 
+                elif now_ts < reveal_ts:
+                    position = REVEAL_LABELS[reveal_key]
                 else:
-                    submission = next((s for s in submissions_data if int(s['Debate Number']) == int(debate['Debate']) and s['Stakeholder'] == stakeholder_name), None)
-                    if submission: debate[position_col] = submission['Position']
-                    else: debate[position_col] = "Not Submitted"
+                    submission = sub_index.get((debate_num, stakeholder_name))
+                    if submission: position = submission['Position']
+                    else: position = "Not Submitted"
+            row[stakeholder_col], row[team_col], row[position_col] = stakeholder_name, team_name, position
+        results_data.append(row)
     
     display_columns = ['Debate', 'Date and Time', 'Resolution','Stakeholder 1', 'Team 1', 'Position 1','Stakeholder 2', 'Team 2', 'Position 2','Stakeholder 3', 'Team 3', 'Position 3','Stakeholder 4', 'Team 4', 'Position 4']
-    html_table = generate_html_table(results_data, display_columns)
-    st.markdown(html_table, unsafe_allow_html=True)
+    df = pd.DataFrame(results_data, columns=display_columns)
+    st.dataframe(df, width="stretch", hide_index=True)
 
 elif page == "Sign Up / Change Position":
     st.title("Debate Position Sign-up")
@@ -180,13 +380,13 @@ elif page == "Sign Up / Change Position":
 
     if st.button("Find My Debates"):
         st.session_state.team_name = team_name_input
-        st.session_state.assigned_debates = find_debates_for_team(st.session_state.team_name, schedule_data)
+        st.session_state.assigned_debates = find_debates_for_team(st.session_state.team_name)
         if not st.session_state.assigned_debates: st.error("Team name not found. Please check the spelling and try again.")
         st.rerun()
 
     if st.session_state.assigned_debates:
         st.header("Step 2: Select a Debate to Sign Up For or Change Position")
-        eligible_debates = [item for item in st.session_state.assigned_debates if not ((reveal_date := get_reveal_date_for_debate(item['debate_details'])) and now >= reveal_date)]
+        eligible_debates = [item for item in st.session_state.assigned_debates if not ((reveal_ts := item['debate_details']['_reveal_ts']) is not None and now_ts >= reveal_ts)]
         if not eligible_debates:
             st.info("There are no open debates for your team to sign up for at this time.")
         else:
@@ -197,12 +397,12 @@ elif page == "Sign Up / Change Position":
                 debate_details, stakeholder_role = selected_item['debate_details'], selected_item['stakeholder_role']
                 st.subheader(f"Declare Position for Debate #{debate_details['Debate']}")
                 st.write(f"**Your Stakeholder Role:** {stakeholder_role}")
-                existing_sub = next((s for s in submissions_data if int(s['Debate Number']) == int(debate_details['Debate']) and s['Stakeholder'] == stakeholder_role), None)
+                existing_sub = sub_index.get((debate_details['_debate_num'], stakeholder_role))
                 default_index = 1 if existing_sub and existing_sub['Position'] == "Against" else 0
                 with st.form(f"signup_form_{debate_details['Debate']}"):
                     position = st.radio("Choose Your Position:", options=["For", "Against"], horizontal=True, index=default_index, key=f"pos_{debate_details['Debate']}")
                     if st.form_submit_button("Submit and Lock Position"):
-                        save_submission(int(debate_details['Debate']), stakeholder_role, st.session_state.team_name, position)
+                        save_submission(debate_details['_debate_num'], stakeholder_role, st.session_state.team_name, position)
                         st.success("Your position has been locked in successfully!")
                         st.balloons()
                         st.rerun()
@@ -211,7 +411,14 @@ if password == INSTRUCTOR_PASSWORD:
     st.sidebar.markdown("---")
     st.sidebar.header("Instructor Panel")
     st.sidebar.success("Access Granted")
-    missing_submissions = [{'debate': d, 'team': t, 'stakeholder': s} for d in schedule_data if (rd := get_reveal_date_for_debate(d)) and now >= rd for i in range(1, 5) if (t := d.get(f'Team {i}')) and (s := d.get(f'Stakeholder {i}')) and not any(int(sub['Debate Number']) == int(d['Debate']) and sub['Stakeholder'] == s for sub in submissions_data)]
+    missing_submissions = []
+    for d in schedule_data:
+        rd = d['_reveal_ts']
+        if rd is None or now_ts < rd: continue
+        dnum = d['_debate_num']
+        for t, s in zip(d['_teams'], d['_stakeholders']):
+            if t and s and (dnum, s) not in sub_index:
+                missing_submissions.append({'debate': d, 'team': t, 'stakeholder': s})
     if missing_submissions:
         with st.sidebar.expander("Assign Positions for Missing Teams", expanded=True):
             st.warning("Action Required: The following teams missed their deadline.")
@@ -221,47 +428,34 @@ if password == INSTRUCTOR_PASSWORD:
                 selected_item = missing_options[selected_missing_str]
                 admin_position = st.radio("Assign Position:", ["For", "Against"], key=f"admin_pos_{selected_item['debate']['Debate']}_{selected_item['stakeholder']}")
                 if st.button("Force Submit Position"):
-                    save_submission(int(selected_item['debate']['Debate']), selected_item['stakeholder'], selected_item['team'], admin_position)
+                    save_submission(selected_item['debate']['_debate_num'], selected_item['stakeholder'], selected_item['team'], admin_position)
                     st.success("Position assigned.")
                     st.rerun()
     with st.sidebar.expander("Danger Zone"):
         st.error("This will delete all submissions and cannot be undone.")
         if st.checkbox("I understand this will delete all student submissions."):
             if st.button("Reset All Submissions"):
-                with file_lock:
-                    if os.path.exists(SUBMISSIONS_FILE): os.remove(SUBMISSIONS_FILE)
+                reset_submissions()
                 st.success("All submissions have been deleted.")
                 st.rerun()
     
     with st.sidebar.expander("System Diagnostics"):
         st.write("**Schedule Sanity Check**")
         st.write("Checks if every debate in the CSV has a matching reveal date in the script.")
-        errors_found = False
-        
-        for row in schedule_data:
-            date_str = row.get('Date and Time', '')
-            if date_str:
-                try:
-                    dt_obj = datetime.strptime(date_str.split()[0], '%Y-%m-%d')
-                    key = dt_obj.strftime('%b %d')
-                    if key not in REVEAL_SCHEDULE:
-                        st.error(f"Mismatch Found! The date '{date_str}' from your CSV (key: '{key}') is not in the REVEAL_SCHEDULE dictionary.")
-                        errors_found = True
-                except ValueError:
-                    st.error(f"Could not parse date '{date_str}' from CSV. Please use YYYY-MM-DD format.")
-                    errors_found = True
+        schedule_errors = _sanity_check(_file_mtime(SCHEDULE_FILE))
+        for error in schedule_errors:
+            st.error(error)
         
-        if not errors_found:
+        if not schedule_errors:
             st.success("All debate dates in your CSV have a matching reveal date.")
         
         st.markdown("---")
         st.write("**System Time Debugger**")
-        now_for_debug = datetime.now(pytz.timezone(TIMEZONE))
-        st.write(f"**Current App Time:** `{now_for_debug.strftime('%Y-%m-%d %H:%M:%S %Z')}`")
+        st.write(f"**Current App Time:** `{now.strftime('%Y-%m-%d %H:%M:%S %Z')}`")
         sample_reveal_date = REVEAL_SCHEDULE.get("Sep 26")
         if sample_reveal_date:
             st.write(f"**Sample Reveal Date (Sep 26):** `{sample_reveal_date.strftime('%Y-%m-%d %H:%M:%S %Z')}`")
-            comparison_result = now_for_debug < sample_reveal_date
+            comparison_result = now < sample_reveal_date
             st.write(f"**Is current time before reveal time?** `{comparison_result}`")
             if not comparison_result:
                 st.warning("Comparison is FALSE. This is why positions for this date may be revealing.")